@@ -1,34 +1,49 @@
 # custom_duckduckgo.py
 #
 # LangChain‑compatible DuckDuckGo search wrapper with:
-#   • optional real Chrome/Chromium via Selenium
+#   • optional real Chrome/Chromium via Selenium (pooled, pre‑warmed drivers)
 #   • proxy + arbitrary headers on every tier
 #   • automatic proxy‑bypass for Chromedriver handshake
 #   • smart retries and a final pure‑Requests HTML fallback
 #
+import atexit
 import contextlib
+import copy
+import functools
+import http.cookiejar
+import json
 import logging
 import os
+import queue
+import re
+import sys
+import threading
 import traceback
 import time
-from typing import Any, Callable, Dict, List, Optional
-from urllib.parse import quote, urlencode
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from urllib.parse import quote, quote_plus, unquote, urlencode
 
-from bs4 import BeautifulSoup
 from ddgs import ddgs  # ddgs.DDGS is a class, ddgs.ddgs is a module
 from ddgs import DDGS  # ddgs.DDGS is a class, ddgs.ddgs is a module
 from ddgs.exceptions import DDGSException
 from langchain_community.tools.ddg_search.tool import DuckDuckGoSearchRun
 from langchain_community.utilities.duckduckgo_search import DuckDuckGoSearchAPIWrapper
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from selenium import webdriver
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+import lxml.etree
+import lxml.html
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
 import random as random
-import primp
+import primp  # lightweight, precompiled wheels available
 
 INTERNAL_MAX_RETURN = 10
 logger = logging.getLogger(__name__)
@@ -37,6 +52,10 @@ _DEFAULT_UA = (
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/125.0 Safari/537.36"
 )
+# Env proxy fallback, resolved once at import.  _new_driver briefly pops
+# HTTP(S)_PROXY while Selenium‑Manager runs, so per‑call env reads could race
+# with it and silently go out without the proxy.
+_ENV_PROXY = os.getenv("HTTP_PROXY") or os.getenv("HTTPS_PROXY")
 
 __all__ = [
     "PatchedDuckDuckGoSearchAPIWrapper",
@@ -45,42 +64,399 @@ __all__ = [
     "BrowserDuckDuckGoSearchRun",
 ]
 
+# Precompiled selectors for DDG html result pages (class‑token match, like CSS)
+_XPATH_LINKS = lxml.etree.XPath(
+    "//a[contains(concat(' ', normalize-space(@class), ' '), ' result__a ')]"
+)
+_XPATH_SNIPS = lxml.etree.XPath(
+    "//*[self::a or self::div]"
+    "[contains(concat(' ', normalize-space(@class), ' '), ' result__snippet ')]"
+)
+
+
+# (links, snippets) pairs tried in order on one parsed tree: the html endpoint
+# layout first, then the lite layout DDG sometimes serves instead
+_DDG_SELECTORS = (
+    (_XPATH_LINKS, _XPATH_SNIPS),
+    (
+        lxml.etree.XPath("//a[contains(concat(' ', normalize-space(@class), ' '), ' result-link ')]"),
+        lxml.etree.XPath("//td[contains(concat(' ', normalize-space(@class), ' '), ' result-snippet ')]"),
+    ),
+)
+
+
+def _ddg_nodes(html: str) -> tuple[list, list]:
+    """Result anchors and snippet nodes of a DDG html page, in page order."""
+    if not html or not html.strip():
+        return [], []
+    try:
+        doc = lxml.html.fromstring(html)
+    except (lxml.etree.ParserError, ValueError) as exc:
+        # e.g. comment‑only bodies, or XHTML with an encoding declaration
+        logger.debug("Could not parse DDG page: %s", exc)
+        return [], []
+    for links_xp, snips_xp in _DDG_SELECTORS:
+        links = links_xp(doc)
+        if links:
+            return links, snips_xp(doc)
+    return [], []
+
+
+def _node_text(el: Any) -> str:
+    return " ".join(el.text_content().split())
+
+
+# DDG wraps every result as /l/?uddg=<target>&rut=...
+_UDDG_RE = re.compile(r"[?&]uddg=([^&]+)")
+
+
+def _real_url(raw_href: str) -> str:
+    m = _UDDG_RE.search(raw_href)
+    return unquote(m.group(1)) if m else raw_href
+
+
+# ────────────────────────────────────────────────────────────────────────
+# In‑process result cache (LRU + TTL, shared by all wrapper instances)
+# ────────────────────────────────────────────────────────────────────────
+_CACHE_MAXSIZE = 512
+_CACHE_TTL = 300  # seconds
+_RESULT_CACHE: "OrderedDict[tuple, tuple[float, tuple]]" = OrderedDict()
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key: tuple) -> List[Dict[str, str]] | None:
+    with _RESULT_CACHE_LOCK:
+        entry = _RESULT_CACHE.get(key)
+        if entry is None:
+            return None
+        stamp, results = entry
+        if time.monotonic() - stamp > _CACHE_TTL:
+            del _RESULT_CACHE[key]
+            return None
+        _RESULT_CACHE.move_to_end(key)
+    # hand out a copy so callers can't mutate the cached entry
+    return copy.deepcopy(list(results))
+
+
+def _cache_put(key: tuple, results: List[Dict[str, str]]) -> None:
+    frozen = tuple(copy.deepcopy(results))
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[key] = (time.monotonic(), frozen)
+        _RESULT_CACHE.move_to_end(key)
+        while len(_RESULT_CACHE) > _CACHE_MAXSIZE:
+            _RESULT_CACHE.popitem(last=False)
+
+
+# Negative cache: DDG anti‑bot / rate‑limit pages, keyed by proxy ("" = none).
+# While an entry is fresh the html‑endpoint tiers are skipped for that proxy.
+_BLOCK_MARKERS = (b"Unfortunately, bots", b"anomaly detected")
+_BLOCK_TTL = 60  # seconds
+_RATELIMIT_CACHE: Dict[str, float] = {}
+_RATELIMIT_LOCK = threading.Lock()
+
+
+def _is_block_page(body: bytes) -> bool:
+    return any(marker in body for marker in _BLOCK_MARKERS)
+
+
+def _mark_blocked(proxy: str | None) -> None:
+    logger.warning("DDG served a block page via proxy %r; backing off for %ds", proxy, _BLOCK_TTL)
+    with _RATELIMIT_LOCK:
+        _RATELIMIT_CACHE[proxy or ""] = time.monotonic()
+
+
+def _recently_blocked(proxy: str | None) -> bool:
+    with _RATELIMIT_LOCK:
+        stamp = _RATELIMIT_CACHE.get(proxy or "")
+        if stamp is None:
+            return False
+        if time.monotonic() - stamp > _BLOCK_TTL:
+            del _RATELIMIT_CACHE[proxy or ""]
+            return False
+        return True
+
+
+# ────────────────────────────────────────────────────────────────────────
+# Helper tier 0 – PRIMP (fast HTTP client with browser impersonation)
+# ────────────────────────────────────────────────────────────────────────
+# Requires: `pip install -U primp` (https://github.com/deedy5/primp)
+# Notes for massive parallel runs:
+#   • One client per thread and config, reused so TLS/HTTP2 setup is paid once;
+#     cookie_store=False keeps queries stateless.  A client that errors is
+#     closed and rebuilt on the next call.
+#   • No global env mutation; proxy is passed directly by the caller.
+#   • Optional overrides via env: PRIMP_IMPERSONATE, PRIMP_IMPERSONATE_OS.
+_PRIMP_LOCAL = threading.local()
+
+
+@functools.lru_cache(maxsize=1)
+def _impersonate_cfg() -> tuple[str, str]:
+    # read once per process; call _impersonate_cfg.cache_clear() after changing the env
+    return (
+        os.getenv("PRIMP_IMPERSONATE", "chrome_131"),
+        os.getenv("PRIMP_IMPERSONATE_OS", "windows"),
+    )
+
+
+def _primp_key(
+    proxy: str | None,
+    headers: Dict[str, str] | None,
+    impersonate: str,
+    impersonate_os: str,
+) -> tuple:
+    return (proxy, impersonate, impersonate_os, tuple(sorted((headers or {}).items())))
+
+
+def _primp_client(
+    proxy: str | None,
+    headers: Dict[str, str] | None,
+    impersonate: str,
+    impersonate_os: str,
+) -> Any:
+    clients = getattr(_PRIMP_LOCAL, "clients", None)
+    if clients is None:
+        clients = _PRIMP_LOCAL.clients = {}
+    key = _primp_key(proxy, headers, impersonate, impersonate_os)
+    client = clients.get(key)
+    if client is None:
+        client = primp.Client(
+            impersonate=impersonate,
+            impersonate_os=impersonate_os,
+            proxy=proxy,
+            timeout=12,
+            cookie_store=False,       # avoid state across queries
+            follow_redirects=True,
+        )
+        # If caller supplied extra headers, apply after impersonation
+        if headers:
+            with contextlib.suppress(Exception):
+                client.headers_update(headers)
+        clients[key] = client
+    return client
+
+
+def _drop_primp_client(
+    proxy: str | None,
+    headers: Dict[str, str] | None,
+    impersonate: str,
+    impersonate_os: str,
+) -> None:
+    key = _primp_key(proxy, headers, impersonate, impersonate_os)
+    client = getattr(_PRIMP_LOCAL, "clients", {}).pop(key, None)
+    if client is not None:
+        with contextlib.suppress(Exception):
+            close_fn = getattr(client, "close", None)
+            if callable(close_fn):
+                close_fn()
+
+
+def _fetch_html(
+    query: str,
+    *,
+    param_suffix: str,
+    proxy: str | None,
+    headers: Dict[str, str] | None,
+) -> str:
+    """
+    Fetch the DDG html results page; "" on a non‑2xx or empty response.
+    ``param_suffix`` is the pre‑encoded "&kp=…&df=…&kl=…" tail (or "").
+    Transport errors propagate.
+    """
+    _imp, _imp_os = _impersonate_cfg()
+
+    _client = _primp_client(proxy, headers, _imp, _imp_os)
+    try:
+        _resp = _client.get(
+            f"https://html.duckduckgo.com/html?q={quote_plus(query)}{param_suffix}", timeout=12
+        )
+    except Exception:
+        # don't hand a possibly broken connection to the next query
+        _drop_primp_client(proxy, headers, _imp, _imp_os)
+        raise
+
+    if _is_block_page(_resp.content):
+        _mark_blocked(proxy)
+        return ""
+    if 200 <= _resp.status_code < 300 and _resp.text:
+        return _resp.text
+    return ""
+
+
+# Result "body" layout, with the bound str.format hoisted out of the loop
+_BODY_FMT = "__START_OF_SOURCE {0}__ <CONTENT> {1} </CONTENT> <URL> {2} </URL> __END_OF_SOURCE {0}__".format
+
+
+def _mk_result(i: int, a: Any, snip: Any) -> Dict[str, Any]:
+    _raw = a.get("href", "")
+    return {
+        "id": i,
+        "title": _node_text(a),
+        "href": _raw,
+        "body": _BODY_FMT(i, _node_text(snip) if snip is not None else "", _real_url(_raw)),
+    }
+
+
+def _parse_html(html: str, max_results: int) -> List[Dict[str, str]]:
+    _links, _snips = _ddg_nodes(html)
+    _limit = int(max_results or INTERNAL_MAX_RETURN)
+    _n_snips = len(_snips)
+    return [
+        _mk_result(i, a, _snips[i - 1] if i <= _n_snips else None)
+        for i, a in enumerate(_links[:_limit], 1)
+    ]
+
+
+def _primp_search(
+    query: str,
+    *,
+    max_results: int,
+    param_suffix: str,
+    proxy: str | None,
+    headers: Dict[str, str] | None,
+) -> List[Dict[str, str]]:
+    return _parse_html(
+        _fetch_html(query, param_suffix=param_suffix, proxy=proxy, headers=headers),
+        max_results,
+    )
+
+
+# ────────────────────────────────────────────────────────────────────────
+# Tier racing – run independent HTTP tiers side by side
+# ────────────────────────────────────────────────────────────────────────
+_RACE_POOL: ThreadPoolExecutor | None = None
+_RACE_POOL_LOCK = threading.Lock()
+
+
+def _race_pool() -> ThreadPoolExecutor:
+    # one process‑wide pool so racing doesn't pay thread start‑up per query
+    global _RACE_POOL
+    with _RACE_POOL_LOCK:
+        if _RACE_POOL is None:
+            _RACE_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="asa-tier")
+        return _RACE_POOL
+
+
+def _race(*tiers: tuple[str, Callable[[], List[Dict[str, str]]]]) -> List[Dict[str, str]]:
+    """
+    Run every tier concurrently and return the first non‑empty result.
+    Losers still queued are cancelled; ones already running finish in the
+    background and their results are dropped.
+    """
+    pool = _race_pool()
+    futures = {pool.submit(fn): name for name, fn in tiers}
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    out = fut.result()
+                except Exception as exc:
+                    logger.debug("%s tier failed: %s", futures[fut], exc)
+                    continue
+                if out:
+                    return out
+        return []
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
 # ────────────────────────────────────────────────────────────────────────
 # Helper tier 2 – ddgs HTTP API (with retry and polite UA)
 # ────────────────────────────────────────────────────────────────────────
+_DDGS_LOCAL = threading.local()
+
+
+def _thread_ddgs(proxy: str | None) -> Any:
+    """
+    One open ddgs client per (thread, proxy), entered once and reused, so
+    repeated calls skip the per‑call __enter__/__exit__ session setup.
+    """
+    clients = getattr(_DDGS_LOCAL, "clients", None)
+    if clients is None:
+        clients = _DDGS_LOCAL.clients = {}
+    client = clients.get(proxy)
+    if client is None:
+        client = clients[proxy] = ddgs(proxy=proxy, timeout=20).__enter__()
+    return client
+
+
+def _drop_thread_ddgs(proxy: str | None) -> None:
+    client = getattr(_DDGS_LOCAL, "clients", {}).pop(proxy, None)
+    if client is not None:
+        with contextlib.suppress(Exception):
+            client.__exit__(None, None, None)
+
+
 def _with_ddgs(
     proxy: str | None,
     headers: Dict[str, str] | None,
     fn: Callable[[ddgs], Any],
     *,
     retries: int = 3,
-    backoff: float = 1.5,
+    backoff: float = 2.0,
+    base_sleep: float = 0.5,
 ) -> Any:
-    proxy = proxy or os.getenv("HTTP_PROXY") or os.getenv("HTTPS_PROXY")
+    proxy = proxy or _ENV_PROXY
     headers = dict(headers or {})
     headers.setdefault("User-Agent", _DEFAULT_UA)
 
-    if proxy:
-        os.environ.setdefault("HTTP_PROXY", proxy)
-        os.environ.setdefault("HTTPS_PROXY", proxy)
-
-    sleep = 0.01
+    sleep = base_sleep
     for attempt in range(1, retries + 1):
         try:
             #with DDGS(proxy=proxy, headers=headers, timeout=20) as client:
-            with ddgs(proxy=proxy, timeout=20) as client:
-                return fn(client)
+            return fn(_thread_ddgs(proxy))
         except DDGSException as exc:
+            _drop_thread_ddgs(proxy)  # retry on a fresh session
             logger.warning("ddgs raised %s (try %d/%d)", exc, attempt, retries)
             if attempt == retries:
                 raise
-            time.sleep(sleep)
+            # jittered so parallel workers don't retry in lock‑step
+            time.sleep(sleep * random.uniform(0.5, 1.5))
             sleep *= backoff
 
 
+class _OrjsonShim:
+    """Stands in for the stdlib json module: orjson.loads, everything else stdlib."""
+
+    def __init__(self, loads: Callable[[Any], Any]) -> None:
+        self._fast_loads = loads
+
+    def loads(self, s: Any, *args: Any, **kw: Any) -> Any:
+        if args or kw:  # hooks/kwargs orjson doesn't support
+            return json.loads(s, *args, **kw)
+        return self._fast_loads(s)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(json, name)
+
+
+def _use_orjson_in_ddgs() -> None:
+    """
+    ddgs' JSON engines (images/news/videos/wikipedia) call json.loads on
+    every payload.  If orjson is installed, point their module‑level `json`
+    at a shim backed by orjson; the global json module is left untouched.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return
+    shim = _OrjsonShim(orjson.loads)
+    for name, mod in list(sys.modules.items()):
+        if name.startswith("ddgs.") and getattr(mod, "json", None) is json:
+            mod.json = shim
+
+
+_use_orjson_in_ddgs()
+
+
 # ────────────────────────────────────────────────────────────────────────
 # Helper tier 1 – real browser (Selenium)
 # ────────────────────────────────────────────────────────────────────────
+_ENV_LOCK = threading.Lock()
+
+
 def _new_driver(
     *,
     proxy: str | None,
@@ -103,17 +479,20 @@ def _new_driver(
     if proxy:
         opts.add_argument(f"--proxy-server={proxy}")
 
-    # Temporarily clear proxies so Selenium‑Manager can download Chromedriver
-    saved_env: Dict[str, str] = {}
-    if bypass_proxy_for_driver:
-        for var in ("HTTP_PROXY", "HTTPS_PROXY"):
-            if var in os.environ:
-                saved_env[var] = os.environ.pop(var)
+    # Temporarily clear proxies so Selenium‑Manager can download Chromedriver.
+    # os.environ is process‑wide, so the pop/restore window is serialised; the
+    # other tiers use the import‑time _ENV_PROXY and never read it mid‑window.
+    with _ENV_LOCK if bypass_proxy_for_driver else contextlib.nullcontext():
+        saved_env: Dict[str, str] = {}
+        if bypass_proxy_for_driver:
+            for var in ("HTTP_PROXY", "HTTPS_PROXY"):
+                if var in os.environ:
+                    saved_env[var] = os.environ.pop(var)
 
-    try:
-        driver = webdriver.Chrome(options=opts)
-    finally:
-        os.environ.update(saved_env)
+        try:
+            driver = webdriver.Chrome(options=opts)
+        finally:
+            os.environ.update(saved_env)
 
     if headers:
         try:
@@ -125,6 +504,138 @@ def _new_driver(
     return driver
 
 
+class _DriverPool:
+    """
+    Fixed‑size pool of warm Selenium drivers sharing one proxy/header setup.
+    Saves the browser cold start (and Selenium‑Manager driver lookup) on
+    every browser‑tier query.  A slot holding ``None`` is respawned lazily.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        *,
+        proxy: str | None,
+        headers: Dict[str, str] | None,
+        headless: bool,
+        bypass_proxy_for_driver: bool,
+    ) -> None:
+        self._spawn = functools.partial(
+            _new_driver,
+            proxy=proxy,
+            headers=headers,
+            headless=headless,
+            bypass_proxy_for_driver=bypass_proxy_for_driver,
+        )
+        self._idle: "queue.Queue[Any]" = queue.Queue(maxsize=size)
+        try:
+            for _ in range(size):
+                try:
+                    self._idle.put(self._spawn())
+                except WebDriverException as exc:
+                    logger.warning("Could not pre-warm driver (%s); will retry on demand.", exc)
+                    self._idle.put(None)
+        except BaseException:
+            self.close()  # don't leak the browsers already started
+            raise
+
+    def acquire(self, timeout: float = 30) -> Any:
+        try:
+            driver = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise WebDriverException(f"no Selenium driver free after {timeout}s")
+        if driver is None:
+            try:
+                driver = self._spawn()
+            except BaseException:
+                self._idle.put(None)  # give the slot back
+                raise
+        return driver
+
+    def release(self, driver: Any) -> None:
+        # wipe per‑query state so the next caller starts clean
+        try:
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+        except Exception as exc:  # a dead browser often surfaces as urllib3/OSError
+            logger.debug("Driver reset failed (%s); replacing it.", exc)
+            self.discard(driver)
+            return
+        self._idle.put(driver)
+
+    def discard(self, driver: Any) -> None:
+        with contextlib.suppress(Exception):
+            driver.quit()
+        self._idle.put(None)
+
+    def close(self) -> None:
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if driver is not None:
+                with contextlib.suppress(Exception):
+                    driver.quit()
+
+
+_POOL_SIZE = max(1, int(os.getenv("ASA_DRIVER_POOL_SIZE", "1")))
+_POOLS: Dict[tuple, _DriverPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def _driver_pool(
+    *,
+    proxy: str | None,
+    headers: Dict[str, str] | None,
+    headless: bool,
+    bypass_proxy_for_driver: bool,
+) -> _DriverPool:
+    # drivers are bound to their proxy/headers at launch, so pool per config
+    key = (proxy, tuple(sorted((headers or {}).items())), headless, bypass_proxy_for_driver)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+    if pool is not None:
+        return pool
+
+    # Warm the browsers outside the lock so other configs aren't stalled
+    # behind N cold starts; if another thread won the race, keep its pool.
+    fresh = _DriverPool(
+        _POOL_SIZE,
+        proxy=proxy,
+        headers=headers,
+        headless=headless,
+        bypass_proxy_for_driver=bypass_proxy_for_driver,
+    )
+    with _POOLS_LOCK:
+        pool = _POOLS.setdefault(key, fresh)
+    if pool is not fresh:
+        fresh.close()
+    return pool
+
+
+@atexit.register
+def _close_driver_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+# In‑page extraction for the browser tier: [{href, title, snippet}, ...]
+_JS_RESULTS = """
+const snips = document.querySelectorAll('a.result__snippet, div.result__snippet');
+return Array.from(document.querySelectorAll('a.result__a'))
+  .slice(0, arguments[0])
+  .map((a, i) => ({
+    href: a.getAttribute('href') || '',
+    title: a.textContent || '',
+    snippet: snips[i] ? snips[i].textContent || '' : '',
+  }));
+"""
+
+
 def _browser_search(
     query: str,
     *,
@@ -134,48 +645,40 @@ def _browser_search(
     headless: bool,
     bypass_proxy_for_driver: bool,
     timeout: int = 15,
+    jitter: bool = False,
 ) -> List[Dict[str, str]]:
     
     print("In _browser_search")
     max_results = int(  INTERNAL_MAX_RETURN ) # hardcode 
     
-    driver = _new_driver(
+    pool = _driver_pool(
         proxy=proxy,
         headers=headers,
         headless=headless,
         bypass_proxy_for_driver=bypass_proxy_for_driver,
     )
+    driver = pool.acquire(timeout=30)
+    healthy = True
     try:
+        if jitter:  # opt‑in spacing between requests from parallel workers
+            time.sleep(random.uniform(0, 0.01))
         driver.get(f"https://duckduckgo.com/html/?q={quote(query)}")
         WebDriverWait(driver, timeout).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "a.result__a"))
         )
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        #print(soup)
-        #print("Selected:")
-        #print(soup.select("a.result__snippet"))
-        result_links = soup.select("a.result__a")[:max_results]
-        result_snippets = soup.select("a.result__snippet")[:max_results]
+        # pull just the result triples in‑page rather than shipping the whole DOM
+        results = driver.execute_script(_JS_RESULTS, max_results) or []
         
         # return block
-        from urllib.parse import urlparse, parse_qs, unquote
         return_content = []
-        for idx, link in enumerate(result_links):
-            raw_href = link["href"]
+        for idx, item in enumerate(results):
+            raw_href = item.get("href") or ""
             # extract & decode uddg (or fall back to the raw href)
-            real_url = unquote(
-                parse_qs(urlparse(raw_href).query)
-                .get("uddg", [raw_href])[0]
-                )
-            snippet = (
-                result_snippets[idx].get_text(strip=True)
-                if idx < len(result_snippets)
-                else ""
-                )
+            real_url = _real_url(raw_href)
+            snippet = " ".join((item.get("snippet") or "").split())
             return_content.append({
             "id": idx + 1,
-            "title": link.get_text(strip=True),
+            "title": " ".join((item.get("title") or "").split()),
             "href": raw_href,
                 "body": f"__START_OF_SOURCE {idx + 1}__ <CONTENT> {snippet} </CONTENT> <URL> {real_url} </URL> __END_OF_SOURCE  {idx + 1}__"
             })
@@ -184,15 +687,91 @@ def _browser_search(
         #print(return_content)
     
         return return_content
+    except TimeoutException:
+        raise  # no results on the page – the driver itself is fine
+    except Exception:
+        # anything else (WebDriverException, urllib3/ConnectionError from a
+        # dead browser, ...) may have left the driver unusable – replace it
+        healthy = False
+        raise
     finally:
-        time.sleep(random.uniform(0, 0.01))
-        with contextlib.suppress(Exception):
-            driver.quit()
+        if healthy:
+            pool.release(driver)
+        else:
+            pool.discard(driver)
 
 
 # ────────────────────────────────────────────────────────────────────────
-# Helper tier 3 – tiny Requests + BeautifulSoup fallback
+# Helper tier 3 – tiny Requests + lxml fallback
 # ────────────────────────────────────────────────────────────────────────
+def _stream_links(
+    chunks: Iterable[bytes],
+    max_results: int,
+    *,
+    encoding: str | None = None,
+) -> List[tuple[str, str]]:
+    """
+    Incrementally parse a DDG html page and return (title, href) for the
+    first max_results result links, without reading the rest of the body.
+    """
+    if max_results <= 0:
+        return []
+    parser = lxml.etree.HTMLPullParser(events=("end",), tag="a", encoding=encoding)
+    found: List[tuple[str, str]] = []
+
+    def _collect() -> bool:
+        for _, el in parser.read_events():
+            if " result__a " in f" {el.get('class') or ''} ":
+                found.append((" ".join("".join(el.itertext()).split()), el.get("href", "")))
+                if len(found) >= max_results:
+                    return True
+            el.clear()  # done with this anchor – free it
+        return False
+
+    for chunk in chunks:
+        parser.feed(chunk)
+        if _collect():
+            return found
+    parser.close()
+    _collect()
+    return found
+
+
+def _until_blocked(chunks: Iterable[bytes], proxy: str | None) -> Iterable[bytes]:
+    # pass chunks through, stopping (and noting the block) at a block page
+    tail = b""
+    for chunk in chunks:
+        if _is_block_page(tail + chunk):
+            _mark_blocked(proxy)
+            return
+        tail = chunk[-32:]  # markers may straddle a chunk boundary
+        yield chunk
+
+
+def _make_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"}),  # the DDG html POST is a search, safe to repeat
+            raise_on_status=False,  # hand the last response to raise_for_status()
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # keep the shared session stateless, like the bare requests.post it replaces
+    session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+# Shared keep‑alive pool so repeat scrapes skip the TCP/TLS handshake
+_SESSION = _make_session()
+
+
 def _requests_scrape(
     query: str,
     *,
@@ -208,23 +787,47 @@ def _requests_scrape(
     url = "https://html.duckduckgo.com/html"
     headers = dict(headers or {})
     headers.setdefault("User-Agent", _DEFAULT_UA)
-    proxies = {"http": proxy, "https": proxy} if proxy else None
+    headers.setdefault("Accept-Encoding", ACCEPT_ENCODING)  # only codecs we can decode
+    # explicit proxies win over the env ones the Session would otherwise read
+    _proxy = proxy or _ENV_PROXY
+    proxies = {"http": _proxy, "https": _proxy} if _proxy else None
 
-    resp = requests.post(
+    # Stream the body and stop parsing once we hold max_results links
+    with _SESSION.post(
         url,
         data=urlencode({"q": query}),
         headers=headers,
         proxies=proxies,
         timeout=timeout,
-    )
-    resp.raise_for_status()
-    soup = BeautifulSoup(resp.text, "html.parser")
+        stream=True,
+    ) as resp:
+        resp.raise_for_status()
+        chunks = resp.iter_content(8192)
+        links = _stream_links(
+            _until_blocked(chunks, proxy),
+            int(max_results or INTERNAL_MAX_RETURN),  # None → default, as in _parse_html
+            encoding=resp.encoding,
+        )
+        # Drain the (small) unparsed rest of the body: closing a partly read
+        # response drops the socket instead of returning it to _SESSION's pool.
+        for _ in chunks:
+            pass
     results: List[Dict[str, str]] = []
-    for i, a in enumerate(soup.select("a.result__a")[:max_results], 1):
-        results.append({"id": i, "title": a.get_text(strip=True), "href": a["href"], "body": ""})
+    for i, (title, href) in enumerate(links, 1):
+        results.append({"id": i, "title": title, "href": href, "body": ""})
     return results
 
 
+def _normalize_query(query: str | None) -> str:
+    # collapse whitespace so "foo  bar" and "foo bar" share one cache entry
+    return " ".join((query or "").split())
+
+
+def _is_degenerate(query: str, max_results: int | None) -> bool:
+    # nothing to search for – every tier would just time out against DDG
+    return not query or (max_results is not None and max_results <= 0)
+
+
 # ────────────────────────────────────────────────────────────────────────
 # Public LangChain‑compatible wrappers
 # ────────────────────────────────────────────────────────────────────────
@@ -246,97 +849,112 @@ class PatchedDuckDuckGoSearchAPIWrapper(DuckDuckGoSearchAPIWrapper):
     use_browser: bool = False
     headless: bool = True
     bypass_proxy_for_driver: bool = True
+    # Fire tier 0 (primp) and tier 3 (Requests) concurrently and keep whichever
+    # returns results first.  Off by default: it doubles hits on DDG per query.
+    race_tiers: bool = False
+
+    # URL‑encoded DDG html params, memoised on the (safesearch, time, region)
+    # they were built from so reassigning a field rebuilds them
+    _suffix_memo: tuple[tuple, str] | None = PrivateAttr(default=None)
+
+    def _param_suffix(self) -> str:
+        settings = (self.safesearch, self.time, self.region)
+        memo = self._suffix_memo
+        if memo is not None and memo[0] == settings:
+            return memo[1]
+        # Map DuckDuckGo params if provided (best-effort parity with ddgs)
+        params: Dict[str, str] = {}
+        if self.safesearch:
+            _ss = str(self.safesearch).lower()
+            # DuckDuckGo html param: kp=-1 (off), 0 (moderate/default), 1 (strict)
+            params["kp"] = {"off": "-1", "moderate": "0", "safe": "1", "strict": "1"}.get(_ss, "0")
+        if self.time:
+            # ddgs uses d/w/m/y; DDG lite accepts df with same shorthands
+            params["df"] = self.time
+        if self.region:
+            # e.g., "us-en", "uk-en", etc. (best‑effort; DDG may ignore unknowns)
+            params["kl"] = self.region
+        suffix = f"&{urlencode(params)}" if params else ""
+        self._suffix_memo = (settings, suffix)
+        return suffix
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop every cached text‑search result."""
+        with _RESULT_CACHE_LOCK:
+            _RESULT_CACHE.clear()
 
     # ── override endpoints ───────────────────────────────────────────────
     def _search_text(self, query: str, max_results: int) -> List[Dict[str, str]]:
+        """
+        Cached front door for text search; misses go to the tier dispatcher.
+        """
+        query = _normalize_query(query)
+        if _is_degenerate(query, max_results):
+            return []
+
+        key = (query, self.region, self.safesearch, self.time, max_results)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+        results = self._search_text_uncached(query, max_results)
+        if results:  # never cache a miss – the next call should retry the tiers
+            _cache_put(key, results)
+        return results
+
+    def _search_text_uncached(self, query: str, max_results: int) -> List[Dict[str, str]]:
         """
         Unified dispatcher for text search with multi‑level fallback.
         """
 
-        # tier 0 - primp 
-        # ────────────────────────────────────────────────────────────────────────
-        # Tier 0 — PRIMP (fast HTTP client with browser impersonation)
-        # Requires: `pip install -U primp` (https://github.com/deedy5/primp)
-        # Notes for massive parallel runs:
-        #   • We create a fresh client per call (cookie_store=False) and close it immediately.
-        #   • No global env mutation; proxy is passed directly from `self.proxy`.
-        #   • Optional overrides via env: PRIMP_IMPERSONATE, PRIMP_IMPERSONATE_OS.
-        try:
-            import primp  # lightweight, precompiled wheels available
-        
-            # Map DuckDuckGo params if provided (best-effort parity with ddgs)
-            _params = {"q": query}
-            if self.safesearch:
-                _ss = str(self.safesearch).lower()
-                # DuckDuckGo html param: kp=-1 (off), 0 (moderate/default), 1 (strict)
-                _params["kp"] = {"off": "-1", "moderate": "0", "safe": "1", "strict": "1"}.get(_ss, "0")
-            if self.time:
-                # ddgs uses d/w/m/y; DDG lite accepts df with same shorthands
-                _params["df"] = self.time
-            if self.region:
-                # e.g., "us-en", "uk-en", etc. (best‑effort; DDG may ignore unknowns)
-                _params["kl"] = self.region
-        
-            _imp = os.getenv("PRIMP_IMPERSONATE", "chrome_131")
-            _imp_os = os.getenv("PRIMP_IMPERSONATE_OS", "windows")
-        
-            _client = primp.Client(
-                impersonate=_imp,
-                impersonate_os=_imp_os,
+        def _tier0() -> List[Dict[str, str]]:
+            return _primp_search(
+                query,
+                max_results=max_results,
+                param_suffix=self._param_suffix(),
                 proxy=self.proxy,
-                timeout=12,
-                cookie_store=False,       # avoid state across parallel workers
-                follow_redirects=True,
+                headers=self.headers,
             )
+
+        def _tier3() -> List[Dict[str, str]]:
+            return _requests_scrape(
+                query,
+                max_results=max_results,
+                proxy=self.proxy,
+                headers=self.headers,
+            )
+
+        _html = ""  # page fetched by tier 0, if any
+        # DDG recently served this proxy a block page: hitting the html endpoint
+        # again only burns time, so go straight to the browser / ddgs tiers.
+        _blocked = _recently_blocked(self.proxy)
+
+        # Tier 0 (+ tier 3 when racing) – plain HTTP fetches of the DDG html endpoint
+        if _blocked:
+            logger.info("Skipping html-endpoint tiers; DDG blocked this proxy recently.")
+        elif self.race_tiers:
+            _out = _race(("primp", _tier0), ("requests", _tier3))
+            if _out:
+                return _out
+        else:
             try:
-                # If caller supplied extra headers, apply after impersonation
-                if self.headers:
-                    with contextlib.suppress(Exception):
-                        _client.headers_update(self.headers)
-        
-                _resp = _client.get("https://html.duckduckgo.com/html", params=_params, timeout=12)
-                if 200 <= _resp.status_code < 300 and _resp.text:
-                    from bs4 import BeautifulSoup
-                    from urllib.parse import urlparse, parse_qs, unquote
-        
-                    _soup = BeautifulSoup(_resp.text, "html.parser")
-                    _links = _soup.select("a.result__a")
-                    _snips = _soup.select("div.result__snippet, a.result__snippet")
-        
-                    _out = []
-                    _limit = int(max_results or INTERNAL_MAX_RETURN)
-                    for i, a in enumerate(_links[:_limit], 1):
-                        _raw = a.get("href", "")
-                        _parsed = urlparse(_raw)
-                        _real = unquote(parse_qs(_parsed.query).get("uddg", [_raw])[0])
-        
-                        _snip = ""
-                        if i - 1 < len(_snips):
-                            with contextlib.suppress(Exception):
-                                _snip = _snips[i - 1].get_text(strip=True)
-        
-                        _out.append(
-                            {
-                                "id": i,
-                                "title": a.get_text(strip=True),
-                                "href": _raw,
-                                "body": f"__START_OF_SOURCE {i}__ <CONTENT> {_snip} </CONTENT> <URL> {_real} </URL> __END_OF_SOURCE {i}__",
-                            }
-                        )
-                    if _out:
-                        return _out
-            finally:
-                # Hard cleanup for parallel safety
-                with contextlib.suppress(Exception):
-                    close_fn = getattr(_client, "close", None)
-                    if callable(close_fn):
-                        close_fn()
-                del _client
-        
-        except Exception as _primp_exc:
-            logger.debug("PRIMP tier failed: %s", _primp_exc)
+                _html = _fetch_html(
+                    query,
+                    param_suffix=self._param_suffix(),
+                    proxy=self.proxy,
+                    headers=self.headers,
+                )
+                _out = _parse_html(_html, max_results) if _html else []
+            except Exception as _primp_exc:
+                logger.debug("PRIMP tier failed: %s", _primp_exc)
+                _out = []
+            if _out:
+                return _out
+            if _html:
+                logger.debug("DDG page fetched but no results parsed; not re-fetching it in tier 3")
         # End tier 0
-        
+
         # Tier 1 – Selenium
         if self.use_browser:
             try:
@@ -374,19 +992,56 @@ class PatchedDuckDuckGoSearchAPIWrapper(DuckDuckGoSearchAPIWrapper):
         except DDGSException as exc:
             logger.warning("ddgs tier failed (%s); falling back to raw scrape.", exc)
 
-        # Tier 3 – raw Requests scrape
-        return _requests_scrape(
-            query,
-            max_results=max_results,
-            proxy=self.proxy,
-            headers=self.headers,
-        )
+        # Tier 3 – raw Requests scrape (already tried above when racing).
+        # Skipped when tier 0 got the page: re‑fetching it would parse the same HTML.
+        if self.race_tiers or _html or _recently_blocked(self.proxy):
+            return []
+        return _tier3()
+
+    def batch_search(
+        self,
+        queries: List[str],
+        kinds: tuple[str, ...] = ("text",),
+        max_workers: int = 8,
+    ) -> Dict[tuple[str, str], List[Dict[str, str]]]:
+        """
+        Fan every (query, kind) pair out over a thread pool; kinds are any of
+        "text", "images", "videos", "news".  Returns results keyed by
+        (query, kind); a pair whose search fails maps to an empty list.
+        """
+        dispatch = {
+            "text": self._ddgs_text,
+            "images": self._ddgs_images,
+            "videos": self._ddgs_videos,
+            "news": self._ddgs_news,
+        }
+        unknown = set(kinds) - set(dispatch)
+        if unknown:
+            raise ValueError(f"Unknown search kind(s): {sorted(unknown)}")
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asa-batch") as pool:
+            # dedupe first so a repeated (query, kind) costs one DDG request, not two
+            futures = {
+                (q, kind): pool.submit(dispatch[kind], q)
+                for q, kind in dict.fromkeys((q, k) for q in queries for k in kinds)
+            }
+        results: Dict[tuple[str, str], List[Dict[str, str]]] = {}
+        for key, fut in futures.items():
+            try:
+                results[key] = fut.result()
+            except Exception as exc:
+                logger.warning("batch %s search for %r failed: %s", key[1], key[0], exc)
+                results[key] = []
+        return results
 
     # LangChain calls the four “_ddgs_*” methods – just delegate.
     def _ddgs_text(self, query: str, **kw):
         return self._search_text(query, kw.get("max_results", self.k))
 
     def _ddgs_images(self, query: str, **kw):
+        query = _normalize_query(query)
+        if _is_degenerate(query, kw.get("max_results", self.k)):
+            return []
         return _with_ddgs(
             self.proxy,
             self.headers,
@@ -402,6 +1057,9 @@ class PatchedDuckDuckGoSearchAPIWrapper(DuckDuckGoSearchAPIWrapper):
         )
 
     def _ddgs_videos(self, query: str, **kw):
+        query = _normalize_query(query)
+        if _is_degenerate(query, kw.get("max_results", self.k)):
+            return []
         return _with_ddgs(
             self.proxy,
             self.headers,
@@ -417,6 +1075,9 @@ class PatchedDuckDuckGoSearchAPIWrapper(DuckDuckGoSearchAPIWrapper):
         )
 
     def _ddgs_news(self, query: str, **kw):
+        query = _normalize_query(query)
+        if _is_degenerate(query, kw.get("max_results", self.k)):
+            return []
         return _with_ddgs(
             self.proxy,
             self.headers,